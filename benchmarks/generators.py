@@ -0,0 +1,57 @@
+# generators.py
+"""Generadores de problemas sintéticos en la sintaxis de data/*.txt.
+
+Cada generador devuelve (premisas, pregunta): una lista de líneas con
+fórmulas y la línea final que se intenta probar por refutación.
+"""
+
+
+def horn_chain(n):
+    """Cadena de Horn profunda: P0(A), ∀x (Pi(x) → Pi+1(x)) ⊢ Pn(A)."""
+    premises = ["P0(A)"]
+    premises += [f"∀x (P{i}(x) → P{i + 1}(x))" for i in range(n)]
+    return premises, f"P{n}(A)"
+
+
+def wide_facts(n):
+    """Base de hechos ancha: n hechos Q(Ci) y una regla; se pregunta por el último."""
+    premises = [f"Q(C{i})" for i in range(n)]
+    premises.append("∀x (Q(x) → R(x))")
+    return premises, f"R(C{n - 1})"
+
+
+def pigeonhole(n):
+    """Principio del palomar con n+1 palomas y n huecos (insatisfacible y ground)."""
+    pigeons = [f"P{i}" for i in range(n + 1)]
+    holes = [f"H{k}" for k in range(n)]
+    premises = [" ∨ ".join(f"En({p},{h})" for h in holes) for p in pigeons]
+    for h in holes:
+        for a in range(len(pigeons)):
+            for b in range(a + 1, len(pigeons)):
+                # El parser liga ¬ a todo lo que sigue: se escribe como implicación
+                premises.append(f"En({pigeons[a]},{h}) → ¬En({pigeons[b]},{h})")
+    # Las premisas son contradictorias: cualquier consulta se deduce
+    return premises, "Absurdo(A)"
+
+
+def nested_biconditional(depth):
+    """∀x (B1(x) ↔ (B2(x) ↔ (... ↔ Bd(x)))): crecimiento exponencial de la FNC."""
+    body = f"B{depth}(x)"
+    for i in range(depth - 1, 0, -1):
+        body = f"(B{i}(x) ↔ {body})"
+    return [f"∀x {body}", "B1(A)"], "B1(A)"
+
+
+def long_formula(n):
+    """Una sola fórmula con n conjunciones, para medir el parser."""
+    body = " ∧ ".join(f"L{i}(x)" for i in range(n))
+    return [f"∀x ({body})"], "L0(A)"
+
+
+GENERATORS = {
+    'horn_chain': horn_chain,
+    'wide_facts': wide_facts,
+    'pigeonhole': pigeonhole,
+    'nested_biconditional': nested_biconditional,
+    'long_formula': long_formula,
+}
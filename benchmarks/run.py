@@ -0,0 +1,233 @@
+# run.py
+"""Banco de pruebas del pipeline: parseo, FNC, carga de cláusulas, resolución y SAT.
+
+Uso:
+    python -m benchmarks.run                       # escala 'small', imprime tabla
+    python -m benchmarks.run --scale medium --out bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 1.5
+
+Contra una línea base, las cláusulas generadas deben coincidir exactamente
+(son deterministas); la memoria y el tiempo admiten una tolerancia, y el
+tiempo (mediana de --repeat ejecuciones) sólo cuenta si además empeora al
+menos --floor segundos.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.generators import GENERATORS
+from source.read import parse_formulas, parse_single_formula
+from source.fnc import FNCConverter
+from source.inference import ResolutionProver, Clause, Literal, TRACE_NONE, SAT_OFF, SAT_AUTO
+from source.stats import Stats
+
+STAGES = ('parse', 'fnc', 'load', 'resolve')
+GROUND_STAGES = STAGES + ('sat',)   # 'sat' sólo tiene sentido en problemas ground
+
+# (generador, tamaños por escala, etapas a medir)
+SUITE = [
+    ('horn_chain', {'small': [5, 10], 'medium': [20, 40], 'large': [80]}, STAGES),
+    ('wide_facts', {'small': [20], 'medium': [100], 'large': [400]}, STAGES),
+    ('pigeonhole', {'small': [2], 'medium': [3], 'large': [4]}, GROUND_STAGES),
+    ('nested_biconditional', {'small': [3, 4], 'medium': [6], 'large': [8]}, ('parse', 'fnc', 'load')),
+    ('long_formula', {'small': [50], 'medium': [300], 'large': [1000]}, ('parse', 'fnc')),
+]
+
+
+# ---------- Preparación de entradas por etapa ----------
+def _prepare(premises, question):
+    """Ejecuta el pipeline una vez para obtener la entrada de cada etapa."""
+    text = "\n".join(premises)
+    formulas = parse_formulas(text)
+    conv = FNCConverter()
+    clause_lines = []
+    for fm in formulas:
+        for lits in conv.formula_to_clauses(conv.convert_to_fnc(fm)):
+            line = conv.clause_to_string(lits)
+            if line.strip():
+                clause_lines.append(line)
+    q = parse_single_formula(question).content
+    query = Clause([Literal(q.predicate, q.terms, q.negated)])
+    return {'text': text, 'formulas': formulas, 'clause_lines': clause_lines, 'query': query}
+
+
+def _stage_fn(stage, inp, max_steps):
+    """Devuelve una función sin argumentos que ejecuta la etapa y su Stats."""
+    stats = Stats()
+
+    if stage == 'parse':
+        def fn():
+            stats.incr('formulas', len(parse_formulas(inp['text'])))
+    elif stage == 'fnc':
+        def fn():
+            conv = FNCConverter(stats=stats)
+            for fm in inp['formulas']:
+                conv.formula_to_clauses(conv.convert_to_fnc(fm))
+    elif stage == 'load':
+        def fn():
+            prov = ResolutionProver(stats=stats)
+            for ln in inp['clause_lines']:
+                prov.add_clause(prov.parse_clause_from_string(ln))
+    else:
+        # 'resolve' mide siempre la resolución; 'sat' deja que los conjuntos ground vayan a CDCL
+        sat_mode = SAT_AUTO if stage == 'sat' else SAT_OFF
+        prover = ResolutionProver(max_steps=max_steps, trace_level=TRACE_NONE, sat_mode=sat_mode)
+        for ln in inp['clause_lines']:
+            prover.add_clause(prover.parse_clause_from_string(ln))
+
+        def fn():
+            prover.stats = stats
+            ok, _ = prover.prove_by_refutation(inp['query'])
+            stats.counters['proved'] = int(ok)
+    return fn, stats
+
+
+def measure(stage, inp, repeat, max_steps):
+    """Mediana y mejor tiempo de `repeat` ejecuciones, pico de memoria y cláusulas generadas."""
+    times = []
+    stats = None
+    for _ in range(repeat):
+        fn, stats = _stage_fn(stage, inp, max_steps)
+        # Como timeit: sin el GC, cuyo coste depende de lo que dejaron etapas anteriores
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        finally:
+            gc.enable()
+
+    # Ejecución aparte para la memoria: tracemalloc distorsiona los tiempos
+    fn, _ = _stage_fn(stage, inp, max_steps)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    c = stats.counters
+    clauses = {
+        'parse': c.get('formulas', 0),
+        'fnc': c.get('fnc.clauses', 0),
+        'load': c.get('prover.input_clauses', len(inp['clause_lines'])),
+        'resolve': c.get('resolvents.generated', 0),
+        'sat': c.get('sat.learned', 0),
+    }[stage]
+    out = {'seconds': round(statistics.median(times), 6), 'best': round(min(times), 6), 'peak_kib': round(peak / 1024, 1), 'clauses': clauses}
+    if stage in ('resolve', 'sat'):
+        out['kept'] = c.get('resolvents.kept', 0)
+        out['proved'] = bool(c.get('proved', 0))
+    return out
+
+
+def run_suite(scale='small', repeat=5, max_steps=500, only=None):
+    results = {}
+    for name, sizes, stages in SUITE:
+        if only and name not in only:
+            continue
+        for n in sizes[scale]:
+            inp = _prepare(*GENERATORS[name](n))
+            for stage in stages:
+                results[f"{name}[{n}]/{stage}"] = measure(stage, inp, repeat, max_steps)
+    return {
+        'meta': {
+            'scale': scale,
+            'repeat': repeat,
+            'max_steps': max_steps,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+# ---------- Comparación con una línea base ----------
+def compare(current, baseline, threshold=1.5, floor=0.05, mem_threshold=1.5, mem_floor=64.0):
+    """Lista de (clave, métrica, base, actual, ratio, regresión) para las claves comunes.
+
+    clauses: cualquier diferencia es regresión. peak_kib: ratio > mem_threshold
+    y al menos mem_floor KiB más. seconds: ratio > threshold y al menos floor
+    segundos más (por debajo el ruido domina).
+    """
+    rows = []
+    base = baseline.get('results', {})
+    for key, cur in current['results'].items():
+        if key not in base:
+            continue
+        old = base[key]
+        b, c = old['clauses'], cur['clauses']
+        rows.append((key, 'clauses', b, c, c / b if b else float(c > 0), b != c))
+        if 'proved' in old and 'proved' in cur:
+            b, c = old['proved'], cur['proved']
+            rows.append((key, 'proved', b, c, 1.0 if b == c else 0.0, b != c))
+        b, c = old['peak_kib'], cur['peak_kib']
+        ratio = c / b if b > 0 else float('inf')
+        rows.append((key, 'peak_kib', b, c, ratio, ratio > mem_threshold and c - b >= mem_floor))
+        b, c = old['seconds'], cur['seconds']
+        ratio = c / b if b > 0 else float('inf')
+        rows.append((key, 'seconds', b, c, ratio, ratio > threshold and c - b >= floor))
+    return rows
+
+
+def print_results(report):
+    print(f"{'benchmark':42} {'seg':>10} {'KiB':>10} {'cláusulas':>10}")
+    print("-" * 76)
+    for key, r in report['results'].items():
+        extra = ""
+        if 'proved' in r:
+            extra = "  probado" if r['proved'] else "  no probado"
+        print(f"{key:42} {r['seconds']:10.6f} {r['peak_kib']:10.1f} {r['clauses']:10d}{extra}")
+
+
+def print_comparison(rows, verbose=False):
+    """Tiempos de todas las etapas; cláusulas y memoria sólo si cambian o empeoran."""
+    print(f"\n{'benchmark':42} {'métrica':>9} {'base':>11} {'actual':>11} {'ratio':>8}")
+    print("-" * 85)
+    for key, metric, b, c, ratio, regressed in rows:
+        if metric != 'seconds' and not regressed and not verbose:
+            continue
+        mark = "  REGRESIÓN" if regressed else ""
+        print(f"{key:42} {metric:>9} {float(b):11.6g} {float(c):11.6g} {ratio:8.2f}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de resolución")
+    parser.add_argument('--scale', choices=('small', 'medium', 'large'), default='small')
+    parser.add_argument('--repeat', type=int, default=5, help="ejecuciones por etapa (se usa la mediana)")
+    parser.add_argument('--max-steps', type=int, default=500)
+    parser.add_argument('--only', nargs='*', choices=sorted(GENERATORS), help="generadores a ejecutar")
+    parser.add_argument('--out', help="guarda los resultados en JSON")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior para comparar")
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help="ratio de tiempo a partir del cual se marca regresión")
+    parser.add_argument('--floor', type=float, default=0.05,
+                        help="segundos que debe empeorar una etapa para marcar regresión")
+    parser.add_argument('--mem-threshold', type=float, default=1.5,
+                        help="ratio de memoria pico a partir del cual se marca regresión")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.scale, args.repeat, args.max_steps, args.only)
+    print_results(report)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold, args.floor, args.mem_threshold)
+        print_comparison(rows)
+        if any(r[5] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,66 @@
+import argparse
 import os
-import sys
 
-from source.read import read_formulas_from_file, parse_formulas
+from source.read import read_formulas_from_file, parse_formulas, Formula
 from source.fnc import FNCConverter, print_detailed_structure
-from source.inference import Clause, Literal, perform_inference
+from source.inference import (Clause, Literal, ResolutionProver, perform_inference, TRACE_PROOF,
+                              SAT_AUTO, SAT_OFF, SAT_INSTGEN)
+from source.stats import Stats, SamplingProfiler, NULL_STATS
+from source.tptp import parse_tptp, clauses_to_tptp, clauses_to_dimacs
 
-def convert_and_save(input_path, fnc_out_path, read_out_path):
-    txt = read_formulas_from_file(input_path)
+TPTP_EXTENSIONS = ('.p', '.tptp', '.ax')
+
+
+def is_tptp(path):
+    return os.path.splitext(path)[1].lower() in TPTP_EXTENSIONS
+
+
+def load_tptp(txt, stats):
+    """Premisas, cláusulas cnf y pregunta de un problema TPTP.
+
+    Si la conjetura no es un literal simple, se añade negada a las premisas y
+    la pregunta es None (se refutan directamente las premisas).
+    """
+    with stats.phase('parse'):
+        problem = parse_tptp(txt)
+    stats.incr('parse.formulas', len(problem.formulas) + len(problem.conjectures))
+    formulas = list(problem.formulas)
+    clauses = list(problem.clauses)
+    question = problem.question()
+    if question is None:
+        formulas += [Formula('connective', '¬', [c]) for c in problem.conjectures]
+        clauses += problem.negated_conjectures
+    return formulas, clauses, question
+
+
+def convert_and_save(input_path, fnc_out_path, read_out_path, stats=None):
+    """Escribe read.txt y fnc.txt; devuelve (leído, pregunta).
+
+    `leído` es False si no se pudo leer la entrada (fnc.txt no se escribe);
+    la pregunta puede ser None en problemas TPTP sin conjetura literal.
+    """
+    stats = stats or NULL_STATS
+    with stats.phase('read'):
+        txt = read_formulas_from_file(input_path)
     if not txt:
         print("No se pudo leer el archivo de entrada.")
-        return [], None
+        return False, None
 
-    # Separar líneas y detectar la última (pregunta)
-    lines = [ln.strip() for ln in txt.splitlines() if ln.strip()]
-    question_line = lines[-1]
-    premise_lines = lines[:-1]
-    premise_text = "\n".join(premise_lines)
+    input_clauses = []
+    if is_tptp(input_path):
+        formulas, input_clauses, question_formula = load_tptp(txt, stats)
+    else:
+        # Separar líneas y detectar la última (pregunta)
+        lines = [ln.strip() for ln in txt.splitlines() if ln.strip()]
+        question_line = lines[-1]
+        premise_lines = lines[:-1]
+        premise_text = "\n".join(premise_lines)
 
-    # parsear premisas y pregunta por separado
-    formulas = parse_formulas(premise_text)
-    question_formula = parse_formulas(question_line)[0]
+        # parsear premisas y pregunta por separado
+        with stats.phase('parse'):
+            formulas = parse_formulas(premise_text)
+            question_formula = parse_formulas(question_line)[0]
+        stats.incr('parse.formulas', len(formulas) + 1)
 
     # guardar estructura de las premisas
     os.makedirs(os.path.dirname(read_out_path) if os.path.dirname(read_out_path) else 'output', exist_ok=True)
@@ -34,6 +75,8 @@ def convert_and_save(input_path, fnc_out_path, read_out_path):
         f.write("-"*50 + "\n")
         for i, fm in enumerate(formulas, 1):
             f.write(f"{i}. {fm}\n")
+        for c in input_clauses:
+            f.write(f"cnf: {c}\n")
         f.write(f"\nPregunta (para refutación): {question_formula}\n\n")
         f.write("Estructura detallada de las premisas:\n")
         f.write("-"*50 + "\n")
@@ -42,12 +85,13 @@ def convert_and_save(input_path, fnc_out_path, read_out_path):
             f.write(print_detailed_structure(fm) + "\n")
 
     # Convertir las premisas a FNC
-    conv = FNCConverter()
+    conv = FNCConverter(stats=stats)
     all_clauses = []
     with open(fnc_out_path, 'w', encoding='utf-8') as f:
         f.write("FORMA NORMAL CONJUNTIVA\n")
         f.write("=" * 50 + "\n\n")
-        for fm in formulas:
+        for i, fm in enumerate(formulas, 1):
+            f.write(f"# Premisa {i}: {fm}\n")
             cnf = conv.convert_to_fnc(fm)
             cls = conv.formula_to_clauses(cnf)
             for lits in cls:
@@ -55,19 +99,52 @@ def convert_and_save(input_path, fnc_out_path, read_out_path):
                 if line.strip():
                     f.write(line + "\n")
                     all_clauses.append(line)
-    return question_formula
+        for i, c in enumerate(input_clauses, len(formulas) + 1):
+            f.write(f"# Premisa {i}: {c}\n")
+            line = conv.clause_to_string(c.literals)
+            if line.strip():
+                f.write(line + "\n")
+                all_clauses.append(line)
+    return True, question_formula
+
+
+def export_clauses(fnc_path, out_path, fmt, question_formula=None):
+    """Exporta las cláusulas de fnc.txt (y la consulta negada) a TPTP CNF o DIMACS."""
+    prov = ResolutionProver()
+    prov.load_clauses_from_file(fnc_path)
+    negated = []
+    if question_formula is not None and question_formula.type == 'literal':
+        lit = question_formula.content
+        negated.append(Clause([Literal(lit.predicate, lit.terms, not lit.negated)]))
+    if fmt == 'tptp':
+        text = clauses_to_tptp(prov.clauses, negated)
+    else:
+        try:
+            text, _ = clauses_to_dimacs(prov.clauses + negated)
+        except ValueError as e:
+            print(f"No se pudo exportar a DIMACS: {e}")
+            return
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(text)
 
 
-def infer(fnc_path, inference_out_path, question_formula):
-    """Niega la pregunta final del archivo y prueba por refutación."""
-    if question_formula.type != 'literal':
-        print("La pregunta debe ser una fórmula literal simple.")
-        return
+def infer(fnc_path, inference_out_path, question_formula, stats=None, trace_level=TRACE_PROOF,
+          sat_mode=SAT_AUTO):
+    """Niega la pregunta final del archivo y prueba por refutación.
 
-    # Convertir la fórmula literal directamente a cláusula
-    lit = question_formula.content
-    query_clause = Clause([Literal(lit.predicate, lit.terms, lit.negated)])
-    ok, _ = perform_inference(fnc_path, inference_out_path, query_clause=query_clause)
+    Sin pregunta (problemas TPTP cuya conjetura ya está negada en las
+    premisas) se refutan directamente las cláusulas cargadas.
+    """
+    query_clause = None
+    if question_formula is not None:
+        if question_formula.type != 'literal':
+            print("La pregunta debe ser una fórmula literal simple.")
+            return
+        # Convertir la fórmula literal directamente a cláusula
+        lit = question_formula.content
+        query_clause = Clause([Literal(lit.predicate, lit.terms, lit.negated)])
+    ok, _ = perform_inference(fnc_path, inference_out_path, query_clause=query_clause, stats=stats,
+                              trace_level=trace_level, sat_mode=sat_mode)
 
     final = (
         "VERDADERO - la afirmación final se deduce de las premisas"
@@ -81,11 +158,25 @@ def infer(fnc_path, inference_out_path, question_formula):
 
 
 def main():
-    # Rutas por defecto
-    if len(sys.argv) > 1:
-        input_path = sys.argv[1]
-    else:
-        input_path = "data/curiosidad.txt"
+    parser = argparse.ArgumentParser(description="Motor de resolución de primer orden")
+    parser.add_argument('input', nargs='?', default="data/curiosidad.txt",
+                        help="archivo de fórmulas (la última línea es la pregunta) "
+                             "o problema TPTP (.p, .tptp, .ax)")
+    parser.add_argument('--export', choices=('tptp', 'dimacs'),
+                        help="exporta las cláusulas a output/fnc.p o output/fnc.cnf")
+    parser.add_argument('--trace', type=int, choices=range(4), default=TRACE_PROOF, metavar='NIVEL',
+                        help="0: sin pasos, 1: prueba (por defecto), 2: prueba con unificadores, "
+                             "3: todos los resolventes")
+    parser.add_argument('--sat', choices=(SAT_AUTO, SAT_OFF, SAT_INSTGEN), default=SAT_AUTO,
+                        help="auto: conjuntos ground con CDCL; instgen: además instanciación "
+                             "de Herbrand + SAT; off: sólo resolución")
+    parser.add_argument('--stats', action='store_true',
+                        help="guarda contadores y tiempos por fase en output/stats.json")
+    parser.add_argument('--profile', action='store_true',
+                        help="activa el perfilador de muestreo (implica --stats)")
+    parser.add_argument('--profile-interval', type=float, default=0.001, metavar='SEG',
+                        help="segundos entre muestras del perfilador (por defecto 0.001)")
+    args = parser.parse_args()
 
     out_dir = "output"
     os.makedirs(out_dir, exist_ok=True)
@@ -93,11 +184,25 @@ def main():
     read_out = os.path.join(out_dir, "read.txt")
     inference_out = os.path.join(out_dir, "inference.txt")
 
-    question = convert_and_save(input_path, fnc_out, read_out)
-    if question:
-        infer(fnc_out, inference_out, question)
-    else:
+    stats = None
+    if args.stats or args.profile:
+        profiler = SamplingProfiler(args.profile_interval) if args.profile else None
+        stats = Stats(profiler=profiler)
+        stats.start()
+
+    loaded, question = convert_and_save(args.input, fnc_out, read_out, stats=stats)
+    # Si no se pudo leer la entrada no se usa un fnc.txt de una ejecución anterior
+    if loaded and args.export:
+        ext = '.p' if args.export == 'tptp' else '.cnf'
+        export_clauses(fnc_out, os.path.join(out_dir, "fnc" + ext), args.export, question)
+    if loaded and (question or is_tptp(args.input)):
+        infer(fnc_out, inference_out, question, stats=stats, trace_level=args.trace, sat_mode=args.sat)
+    elif loaded:
         print("No se detectó una pregunta para refutación.")
 
+    if stats is not None:
+        stats.stop()
+        stats.save(os.path.join(out_dir, "stats.json"))
+
 if __name__ == "__main__":
     main()
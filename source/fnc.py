@@ -1,13 +1,17 @@
 # fnc.py
 from source.read import Term, Literal, Formula
+from source.stats import NULL_STATS
 
 class FNCConverter:
-    def __init__(self):
+    def __init__(self, stats=None):
         self.sk_counter = 0
+        self.stats = stats or NULL_STATS
 
     # --- Pipeline ---
     def convert_to_fnc(self, formula):
         """Convierte una fórmula arbitraria en Forma Normal Conjuntiva (FNC)."""
+        if self.stats.enabled:
+            return self._convert_timed(formula)
         f = self._elim_biconditionals(formula)
         f = self._elim_implications(f)
         f = self._push_negations(f)
@@ -17,6 +21,26 @@ class FNCConverter:
         f = self._to_cnf(f)
         return f
 
+    def _convert_timed(self, formula):
+        """Mismo pipeline que convert_to_fnc, cronometrando cada etapa."""
+        st = self.stats
+        st.incr('fnc.formulas')
+        with st.phase('fnc.elim_biconditionals'):
+            f = self._elim_biconditionals(formula)
+        with st.phase('fnc.elim_implications'):
+            f = self._elim_implications(f)
+        with st.phase('fnc.push_negations'):
+            f = self._push_negations(f)
+        with st.phase('fnc.standardize'):
+            f = self._standardize(f, {})
+        with st.phase('fnc.skolemize'):
+            f = self._skolemize(f, [])
+        with st.phase('fnc.drop_forall'):
+            f = self._drop_forall(f)
+        with st.phase('fnc.to_cnf'):
+            f = self._to_cnf(f)
+        return f
+
     # --- 1. Eliminar bicondicionales (↔) ---
     def _elim_biconditionals(self, f):
         if f.type == 'connective' and f.content in ('↔', '⇔', '<->'):
@@ -161,7 +185,9 @@ class FNCConverter:
                 if lits:
                     clauses.append(lits)
 
-        walk(f)
+        with self.stats.phase('fnc.clauses'):
+            walk(f)
+        self.stats.incr('fnc.clauses', len(clauses))
         return clauses
 
     # --- Auxiliares de sustitución y Skolemización ---
@@ -1,4 +1,5 @@
 from source.read import Term, Literal
+from source.stats import NULL_STATS
 
 # ---------- Helpers de normalización ----------
 def term_key(t):
@@ -13,10 +14,43 @@ def lit_key(l):
     """Clave estructural para un literal (incluye signo, predicado y términos)."""
     return (bool(l.negated), l.predicate, tuple(term_key(t) for t in l.terms))
 
+def atom_key(l):
+    """Clave del átomo de un literal, sin signo."""
+    return (l.predicate, tuple(term_key(t) for t in l.terms))
+
+def is_ground_term(t):
+    if t.type == 'variable':
+        return False
+    if t.type == 'function':
+        return all(is_ground_term(a) for a in t.args)
+    return True
+
+def is_ground_clause(c):
+    """True si ningún literal de la cláusula contiene variables."""
+    return all(is_ground_term(t) for l in c.literals for t in l.terms)
+
+
+# ---------- Niveles de traza ----------
+TRACE_NONE = 0      # sólo mensajes de estado
+TRACE_PROOF = 1     # pasos de la prueba que llevan a □
+TRACE_UNIFIERS = 2  # prueba con el unificador de cada paso
+TRACE_FULL = 3      # todos los resolventes retenidos, con unificadores
+
+# ---------- Modos SAT ----------
+SAT_OFF = 'off'          # siempre resolución de primer orden
+SAT_AUTO = 'auto'        # conjuntos ground se deciden con CDCL
+SAT_INSTGEN = 'instgen'  # además, instanciación de Herbrand + SAT para no ground
+
 
 class Clause:
-    def __init__(self, literals):
+    def __init__(self, literals, parents=None, resolved=None, origin=None):
         self.literals = literals
+        self.origin = origin  # premisa de la que proviene (texto), si se conoce
+        # Procedencia compacta: ids de las cláusulas padre y posiciones (i, j)
+        # de los literales resueltos. El unificador se recalcula al renderizar.
+        self.id = None
+        self.parents = parents
+        self.resolved = resolved
 
     def __repr__(self):
         return " ∨ ".join(str(l) for l in self.literals) if self.literals else "□"
@@ -48,10 +82,18 @@ class Substitution:
 
 
 class ResolutionProver:
-    def __init__(self, max_steps=500):
+    def __init__(self, max_steps=500, stats=None, trace_level=TRACE_PROOF, sat_mode=SAT_AUTO,
+                 instgen_depth=1, instgen_max_instances=20000):
         self.clauses = []
         self.trace = []
         self.max_steps = max_steps
+        self.stats = stats or NULL_STATS
+        self.trace_level = trace_level
+        self.sat_mode = sat_mode
+        self.instgen_depth = instgen_depth
+        self.instgen_max_instances = instgen_max_instances
+        self.kept = []      # cláusulas de la última prueba, indexadas por id
+        self.empty = None   # cláusula vacía derivada, si la hubo
 
     def add_clause(self, c):
         self.clauses.append(c)
@@ -67,15 +109,7 @@ class ResolutionProver:
             args = args[:-1]
             terms = []
             if args.strip():
-                for t in self._split_args(args):
-                    t = t.strip()
-                    if '(' in t and t.endswith(')'):
-                        fname = t[:t.index('(')]
-                        inner = t[t.index('(')+1:-1]
-                        inner_terms = [self._make_term(x.strip()) for x in self._split_args(inner)]
-                        terms.append(Term('function', fname, inner_terms))
-                    else:
-                        terms.append(self._make_term(t))
+                terms = [self._make_term(t.strip()) for t in self._split_args(args)]
             lits.append(Literal(pred.strip(), terms, neg))
         return Clause(lits)
 
@@ -97,16 +131,28 @@ class ResolutionProver:
     def _make_term(self, tok):
         if not tok:
             return Term('constant', 'UNK')
+        if '(' in tok and tok.endswith(')'):
+            # Funciones anidadas a cualquier profundidad: F(G(x), A)
+            fname = tok[:tok.index('(')]
+            inner = tok[tok.index('(') + 1:-1]
+            return Term('function', fname, [self._make_term(x.strip()) for x in self._split_args(inner)])
         return Term('variable', tok) if tok[0].islower() else Term('constant', tok)
 
     def load_clauses_from_file(self, path):
-        with open(path, 'r', encoding='utf-8') as f:
+        origin = None
+        with self.stats.phase('prover.load'), open(path, 'r', encoding='utf-8') as f:
             for line in f:
                 ln = line.strip()
+                if ln.startswith('# Premisa'):
+                    origin = ln[2:]
+                    continue
                 if not ln or ln.startswith('#'):
                     continue
                 if '(' in ln and ')' in ln:
-                    self.add_clause(self.parse_clause_from_string(ln))
+                    c = self.parse_clause_from_string(ln)
+                    c.origin = origin
+                    self.add_clause(c)
+        self.stats.incr('prover.input_clauses', len(self.clauses))
 
     # ---------- Unificación ----------
     def unify(self, t1, t2, subst=None):
@@ -170,11 +216,17 @@ class ResolutionProver:
 
     def resolve_pair(self, c1, c2):
         resolvents = []
+        st = self.stats
+        on = st.enabled
         for i, l1 in enumerate(c1.literals):
             for j, l2 in enumerate(c2.literals):
                 if l1.predicate == l2.predicate and l1.negated != l2.negated and len(l1.terms) == len(l2.terms):
                     subst = self.unify_all(l1.terms, l2.terms)
+                    if on:
+                        st.incr('unify.attempts')
                     if subst is None:
+                        if on:
+                            st.incr('unify.failures')
                         continue
                     # Construir resolvente sin duplicados por clave
                     new_lits, seen = [], set()
@@ -191,22 +243,61 @@ class ResolutionProver:
                         if lk not in seen:
                             seen.add(lk); new_lits.append(nl)
                     if not self._is_tautology(new_lits):
-                        resolvents.append(Clause(new_lits))
+                        resolvents.append(Clause(new_lits, (c1.id, c2.id), (i, j)))
+                    elif on:
+                        st.incr('resolvents.tautologies')
+        if on:
+            st.incr('resolve.pairs')
+            st.incr('resolvents.generated', len(resolvents))
         return resolvents
 
     def negate_clause(self, clause):
         return Clause([Literal(l.predicate, l.terms, not l.negated) for l in clause.literals])
 
     def prove_by_refutation(self, query=None):
-        work = list(self.clauses)
-        seen_signatures = {c.signature() for c in work}
+        with self.stats.phase('prover.resolution'):
+            return self._prove_by_refutation(query)
+
+    def _register(self, c):
+        c.id = len(self.kept)
+        self.kept.append(c)
+        return c
+
+    def _prove_by_refutation(self, query):
+        st = self.stats
+        self.kept = []
+        self.empty = None
+        self.trace = []
+        header, footer = [], []
+        # Copias ligeras: los ids pertenecen a esta prueba, no a la cláusula original
+        work = [self._register(Clause(c.literals, origin=c.origin)) for c in self.clauses]
+        with st.phase('prover.index'):
+            seen_signatures = {c.signature() for c in work}
 
         if query is not None:
-            negated = self.negate_clause(query)
-            work.append(negated)
+            negated = self._register(self.negate_clause(query))
+            negated.origin = "Consulta negada"
             seen_signatures.add(negated.signature())
-            self.trace.append(f"Consulta negada añadida: {negated}")
-
+            header.append(f"Consulta negada añadida: {negated}")
+
+        if self.sat_mode != SAT_OFF:
+            decided = self.prove_with_sat(list(self.kept))
+            if decided is not None:
+                ok, lines = decided
+                self.trace = header + lines
+                return ok, self.trace
+
+        ok, end_msg = self._saturate(seen_signatures)
+        if end_msg:
+            footer.append(end_msg)
+        with st.phase('prover.trace'):
+            self.trace = self.render_trace(header, footer)
+        return ok, self.trace
+
+    def _saturate(self, seen_signatures):
+        st = self.stats
+        on = st.enabled
+        work = self.kept
         step = 1
         while step <= self.max_steps:
             added_any = False
@@ -214,28 +305,121 @@ class ResolutionProver:
             pairs = [(work[i], work[j]) for i in range(len(work)) for j in range(i + 1, len(work))]
             for c1, c2 in pairs:
                 for r in self.resolve_pair(c1, c2):
-                    sig = r.signature()
                     if len(r.literals) == 0:
-                        self.trace.append(f"Paso {step}: Resuelvo ({c1}) con ({c2}) ⇒ □ (contradicción)")
-                        return True, self.trace
+                        self.empty = self._register(r)
+                        return True, None
+                    sig = r.signature()
                     if sig not in seen_signatures:
                         seen_signatures.add(sig)
-                        work.append(r)
+                        self._register(r)
                         added_any = True
-                        self.trace.append(f"Paso {step}: Resuelvo ({c1}) con ({c2}) ⇒ {r}")
+                        if on:
+                            st.incr('resolvents.kept')
                         step += 1
                         if step > self.max_steps:
-                            self.trace.append("Límite de pasos alcanzado. Deteniendo resolución.")
-                            return False, self.trace
+                            return False, "Límite de pasos alcanzado. Deteniendo resolución."
+                    elif on:
+                        st.incr('resolvents.duplicates')
+            if on:
+                st.incr('prover.levels')
             if not added_any:
-                self.trace.append("No se pueden generar más resolventes. Fin del proceso.")
-                return False, self.trace
-        self.trace.append("Límite máximo de pasos alcanzado sin contradicción.")
-        return False, self.trace
+                return False, "No se pueden generar más resolventes. Fin del proceso."
+        return False, "Límite máximo de pasos alcanzado sin contradicción."
+
+    # ---------- Vía SAT (ground / instanciación) ----------
+    def prove_with_sat(self, clauses):
+        """Decide con CDCL si procede; devuelve (ok, líneas de traza) o None."""
+        from source.sat import solve_ground, instance_generation
+
+        st = self.stats
+        if all(is_ground_clause(c) for c in clauses):
+            st.incr('sat.ground_fast_path')
+            result = solve_ground(clauses, st)
+            core = [clauses[i] for i in result.core]
+            method = "Conjunto ground: decidido con SAT (CDCL)."
+        elif self.sat_mode == SAT_INSTGEN:
+            result, _, origin = instance_generation(clauses, self.instgen_depth,
+                                                    self.instgen_max_instances, st)
+            if result is None:
+                return None
+            core = [clauses[i] for i in sorted({origin[k] for k in result.core})]
+            method = "Generación de instancias (Herbrand + SAT)."
+        else:
+            return None
+
+        if result.sat:
+            return False, [method, "Satisfacible: la consulta no se deduce de las premisas."]
+        lines = [method]
+        if self.trace_level > TRACE_NONE:
+            lines.append(f"Núcleo insatisfacible ({len(core)} cláusulas):")
+            for c in core:
+                lines.append(f"  {c}" + (f"    [{c.origin}]" if c.origin else ""))
+        lines.append("□ (contradicción): el núcleo es insatisfacible.")
+        return True, lines
+
+    # ---------- Traza y DAG de la prueba ----------
+    def proof_ids(self):
+        """Ids de las cláusulas derivadas que forman el DAG de la prueba de □ (orden topológico)."""
+        if self.empty is None:
+            return []
+        # Postorden: cada paso aparece después de sus padres (los ids no tienen
+        # por qué respetar ese orden si la KB cambió de justificación)
+        out, stack, seen = [], [(self.empty.id, False)], set()
+        while stack:
+            cid, expanded = stack.pop()
+            if expanded:
+                out.append(cid)
+                continue
+            if cid in seen:
+                continue
+            seen.add(cid)
+            c = self.kept[cid]
+            if c.parents is not None:
+                stack.append((cid, True))
+                stack.extend((p, False) for p in reversed(c.parents))
+        return out
+
+    def unifier_of(self, c):
+        """Recalcula el unificador del paso que produjo `c` a partir de sus padres."""
+        p1, p2 = self.kept[c.parents[0]], self.kept[c.parents[1]]
+        i, j = c.resolved
+        return self.unify_all(p1.literals[i].terms, p2.literals[j].terms)
+
+    def render_step(self, n, c, with_unifier=False):
+        p1, p2 = self.kept[c.parents[0]], self.kept[c.parents[1]]
+        tail = "□ (contradicción)" if not c.literals else str(c)
+        lines = [f"Paso {n}: Resuelvo ({p1}) con ({p2}) ⇒ {tail}"]
+        if with_unifier:
+            subst = self.unifier_of(c)
+            pairs = ", ".join(f"{v}/{t}" for v, t in subst.map.items()) if subst else ""
+            lines.append(f"    σ = {{{pairs}}}")
+        return lines
+
+    def render_trace(self, header=(), footer=(), level=None, derived=None):
+        """Construye las líneas de la traza sólo al final, según el nivel pedido.
+
+        `derived` son los ids mostrados en TRACE_FULL; por defecto, todos los
+        resolventes de `kept`.
+        """
+        level = self.trace_level if level is None else level
+        lines = list(header)
+        if level > TRACE_NONE:
+            if level >= TRACE_FULL:
+                if derived is None:
+                    derived = [c.id for c in self.kept if c.parents is not None]
+                ids = list(derived)
+            else:
+                ids = self.proof_ids()
+            with_unifier = level >= TRACE_UNIFIERS
+            for n, cid in enumerate(ids, 1):
+                lines.extend(self.render_step(n, self.kept[cid], with_unifier))
+        lines.extend(footer)
+        return lines
 
 
-def perform_inference(fnc_file, output_file, query_clause=None, imprimir_clausulas=False):
-    prov = ResolutionProver(max_steps=500)
+def perform_inference(fnc_file, output_file, query_clause=None, imprimir_clausulas=False, stats=None,
+                      trace_level=TRACE_PROOF, sat_mode=SAT_AUTO):
+    prov = ResolutionProver(max_steps=500, stats=stats, trace_level=trace_level, sat_mode=sat_mode)
     prov.load_clauses_from_file(fnc_file)
     ok, trace = prov.prove_by_refutation(query_clause)
 
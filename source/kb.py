@@ -0,0 +1,363 @@
+# kb.py
+import threading
+from collections import ChainMap, deque
+
+from source.read import parse_single_formula
+from source.fnc import FNCConverter
+from source.inference import ResolutionProver, Clause, TRACE_PROOF, SAT_OFF
+from source.stats import NULL_STATS
+
+
+class KnowledgeBase:
+    """KB incremental: premisas que se añaden y retractan sin recomputar todo.
+
+    Cada cláusula guarda todas sus justificaciones: (pid,) si proviene de la
+    premisa pid, o (p1, p2, i, j) si es resolvente de p1 y p2 por los literales
+    i y j. Su soporte es el conjunto de premisas de la justificación vigente.
+    Al retractar una premisa sólo se revisan las cláusulas que dependen de ella:
+    sobreviven las que conservan una justificación bien fundada y el resto se
+    elimina de la KB y de los índices. Añadir una premisa reanuda la
+    saturación (bucle de cláusula dada) desde el estado actual.
+
+    Las consultas usan por defecto el conjunto de soporte sobre la KB ya
+    saturada; con sat_mode='auto' o 'instgen' se vuelven a codificar todas las
+    cláusulas de las premisas en cada consulta.
+    """
+
+    def __init__(self, max_steps=500, stats=None, trace_level=TRACE_PROOF, sat_mode=SAT_OFF):
+        self.max_steps = max_steps
+        self.stats = stats or NULL_STATS
+        self.trace_level = trace_level
+        self.sat_mode = sat_mode
+        self.prover = ResolutionProver(max_steps=max_steps, stats=self.stats)
+        self.conv = FNCConverter(stats=self.stats)
+        self.lock = threading.RLock()
+
+        self.premises = {}          # pid -> texto
+        self.premise_clauses = {}   # pid -> [Clause] tal como se compilaron
+        self.next_pid = 1
+        self.store = {}             # id -> Clause viva
+        self.by_sig = {}            # firma -> id
+        self.justs = {}             # id -> [justificación]
+        self.support = {}           # id -> frozenset de premisas
+        self.dependents = {}        # pid -> ids cuyo soporte la incluye
+        self.index = {}             # (predicado, negado) -> ids que contienen ese literal
+        # Copia en escritura: las consultas se quedan con referencias a store e
+        # index; la primera modificación posterior los copia antes de tocarlos
+        self._shared = False
+        self._owned = set()         # claves del índice cuyo conjunto ya es propio
+        self.processed = set()
+        self.unprocessed = deque()
+        self.next_id = 0
+        self.empty = None           # id de □ si la KB es inconsistente
+
+    # ---------- Altas ----------
+    def add_premise(self, formula, saturate=True):
+        """Añade una premisa (texto o Formula) y devuelve su id."""
+        fm = parse_single_formula(formula) if isinstance(formula, str) else formula
+        with self.lock:
+            cnf = self.conv.convert_to_fnc(fm)
+            clauses = [Clause(ls) for ls in self.conv.formula_to_clauses(cnf) if ls]
+            return self._add_premise(str(fm), clauses, saturate)
+
+    def add_clause(self, clause, saturate=True):
+        """Añade una cláusula ya en FNC (p. ej. una entrada cnf de TPTP) como premisa."""
+        with self.lock:
+            return self._add_premise(str(clause), [Clause(clause.literals)], saturate)
+
+    def _add_premise(self, text, clauses, saturate):
+        pid = self.next_pid
+        self.next_pid += 1
+        self.premises[pid] = text
+        self.premise_clauses[pid] = clauses
+        origin = f"Premisa {pid}: {text}"
+        for c in clauses:
+            c.origin = origin
+            cid = self.by_sig.get(c.signature())
+            if cid is not None:
+                self.justs[cid].append((pid,))
+            else:
+                kept = Clause(c.literals, origin=origin)
+                self._insert(kept, (pid,), frozenset((pid,)))
+        self.stats.incr('kb.premises_added')
+        if saturate:
+            self.saturate()
+        return pid
+
+    def _unshare(self):
+        if self._shared:
+            self.store = dict(self.store)
+            self.index = dict(self.index)
+            self._owned = set()
+            self._shared = False
+
+    def _index_set(self, key):
+        """Conjunto del índice para `key` que puede modificarse sin afectar a instantáneas."""
+        ids = self.index.get(key)
+        if ids is None or key not in self._owned:
+            ids = self.index[key] = set(ids or ())
+            self._owned.add(key)
+        return ids
+
+    def _insert(self, c, just, support):
+        self._unshare()
+        cid = self.next_id
+        self.next_id += 1
+        c.id = cid
+        self.store[cid] = c
+        self.by_sig[c.signature()] = cid
+        self.justs[cid] = [just]
+        self.support[cid] = support
+        for q in support:
+            self.dependents.setdefault(q, set()).add(cid)
+        for l in c.literals:
+            self._index_set((l.predicate, l.negated)).add(cid)
+        if not c.literals and self.empty is None:
+            self.empty = cid
+        self.unprocessed.append(cid)
+        return cid
+
+    # ---------- Saturación incremental ----------
+    def saturate(self, max_steps=None):
+        """Procesa cláusulas pendientes hasta `max_steps` resolventes nuevos; devuelve cuántos."""
+        budget = self.max_steps if max_steps is None else max_steps
+        added = 0
+        with self.lock, self.stats.phase('kb.saturate'):
+            while self.unprocessed and added < budget and self.empty is None:
+                cid = self.unprocessed.popleft()
+                g = self.store.get(cid)
+                if g is None or cid in self.processed:
+                    continue
+                partners = self._partners(g, self.index, self.processed)
+                self.processed.add(cid)
+                # La cláusula dada se resuelve entera aunque se pase del presupuesto
+                for oid in partners:
+                    for r in self.prover.resolve_pair(g, self.store[oid]):
+                        added += self._add_resolvent(r)
+        return added
+
+    def _partners(self, g, index, pool):
+        """Ids de `pool` con algún literal complementario a los de `g` (vía índice)."""
+        out = set()
+        for l in g.literals:
+            ids = index.get((l.predicate, not l.negated))
+            if ids:
+                out |= ids
+        out.discard(g.id)
+        return sorted(out & pool)
+
+    def _add_resolvent(self, r):
+        p1, p2 = r.parents
+        just = (p1, p2) + r.resolved
+        cid = self.by_sig.get(r.signature())
+        if cid is not None:
+            self.justs[cid].append(just)
+            self.stats.incr('resolvents.duplicates')
+            return 0
+        self._insert(r, just, self.support[p1] | self.support[p2])
+        self.stats.incr('resolvents.kept')
+        return 1
+
+    # ---------- Retracción ----------
+    def retract(self, pid, saturate=True):
+        """Quita la premisa pid y sólo las cláusulas que ya no tienen justificación.
+
+        Si □ desaparece, la saturación que se había detenido al derivarlo se reanuda.
+        """
+        with self.lock, self.stats.phase('kb.retract'):
+            if pid not in self.premises:
+                raise ValueError(f"premisa desconocida: {pid}")
+            del self.premises[pid]
+            del self.premise_clauses[pid]
+            affected = {cid for cid in self.dependents.pop(pid, ())
+                        if cid in self.store and pid in self.support[cid]}
+            revived = self._revive(affected)
+            dead = affected - set(revived)
+            for cid in dead:
+                self._remove(cid)
+            self.stats.incr('kb.retract.removed', len(dead))
+            self.stats.incr('kb.retract.revived', len(revived))
+        if saturate:
+            self.saturate()
+        return len(dead)
+
+    def _revive(self, affected):
+        """Punto fijo mínimo: cláusulas afectadas con una justificación bien fundada.
+
+        Devuelve {id: justificación} en orden topológico (padres antes que hijos).
+        """
+        ready = deque()
+        missing = {}
+        waiting = {}
+        for cid in affected:
+            for k, just in enumerate(self.justs[cid]):
+                if len(just) == 1:
+                    if just[0] in self.premises:
+                        ready.append((cid, just))
+                    continue
+                parents = {just[0], just[1]}
+                if not all(p in self.store for p in parents):
+                    continue
+                need = parents & affected
+                if not need:
+                    ready.append((cid, just))
+                    continue
+                missing[(cid, k)] = len(need)
+                for p in need:
+                    waiting.setdefault(p, []).append((cid, k, just))
+
+        revived = {}
+        while ready:
+            cid, just = ready.popleft()
+            if cid in revived:
+                continue
+            revived[cid] = just
+            self._rejustify(cid, just)
+            for c2, k, j2 in waiting.pop(cid, ()):
+                missing[(c2, k)] -= 1
+                if missing[(c2, k)] == 0:
+                    ready.append((c2, j2))
+        return revived
+
+    def _rejustify(self, cid, just):
+        self._unshare()
+        # Se sustituye la cláusula en vez de mutarla: las instantáneas de las
+        # consultas en curso conservan la derivación que tenían
+        if len(just) == 1:
+            support = frozenset(just)
+            c = Clause(self.store[cid].literals, origin=f"Premisa {just[0]}: {self.premises[just[0]]}")
+        else:
+            support = self.support[just[0]] | self.support[just[1]]
+            c = Clause(self.store[cid].literals, parents=(just[0], just[1]), resolved=(just[2], just[3]))
+        c.id = cid
+        self.store[cid] = c
+        self.support[cid] = support
+        for q in support:
+            self.dependents.setdefault(q, set()).add(cid)
+        # Se descartan las justificaciones que ya no pueden usarse
+        self.justs[cid] = [j for j in self.justs[cid]
+                           if (j[0] in self.premises if len(j) == 1
+                               else j[0] in self.store and j[1] in self.store)]
+
+    def _remove(self, cid):
+        self._unshare()
+        c = self.store.pop(cid)
+        sig = c.signature()
+        if self.by_sig.get(sig) == cid:
+            del self.by_sig[sig]
+        del self.justs[cid]
+        del self.support[cid]
+        for l in c.literals:
+            if (l.predicate, l.negated) in self.index:
+                ids = self._index_set((l.predicate, l.negated))
+                ids.discard(cid)
+                if not ids:
+                    del self.index[(l.predicate, l.negated)]
+        self.processed.discard(cid)
+        if self.empty == cid:
+            self.empty = None
+        # Las entradas en `unprocessed` y `dependents` se ignoran al no estar en store
+
+    # ---------- Consultas ----------
+    def prove(self, query, max_steps=None, trace_level=None, sat_mode=None, stats=None):
+        """Prueba `query` (Clause o texto de un literal) contra el estado actual.
+
+        La KB no se modifica: la consulta negada es el conjunto de soporte y
+        sólo se resuelven sus descendientes contra las cláusulas de la KB.
+        Devuelve (ok, traza) como ResolutionProver.prove_by_refutation.
+        """
+        if isinstance(query, str):
+            q = parse_single_formula(query)
+            if q.type != 'literal':
+                raise ValueError("la consulta debe ser una fórmula literal simple")
+            query = Clause([q.content])
+        budget = self.max_steps if max_steps is None else max_steps
+        prov = ResolutionProver(max_steps=budget, stats=stats or self.stats,
+                                trace_level=self.trace_level if trace_level is None else trace_level,
+                                sat_mode=self.sat_mode if sat_mode is None else sat_mode)
+        # Sólo la instantánea se toma con el cerrojo, y sin copiar: store e index
+        # quedan compartidos hasta la siguiente modificación (copia en escritura)
+        with self.lock:
+            store, index = self.store, self.index
+            self._shared = True
+            next_id = self.next_id
+            empty = self.empty
+            inputs = []
+            if prov.sat_mode != SAT_OFF:
+                inputs = [c for cls in self.premise_clauses.values() for c in cls]
+
+        with prov.stats.phase('kb.prove'):
+            negated = prov.negate_clause(query)
+            negated.origin = "Consulta negada"
+            header = [f"Consulta negada añadida: {negated}"]
+
+            if empty is not None:
+                prov.kept, prov.empty = store, store[empty]
+                footer = ["La KB es inconsistente: □ ya se deriva de las premisas."]
+                derived = [cid for cid, c in store.items() if c.parents is not None]
+                return True, prov.render_trace(header, footer, derived=derived)
+
+            if prov.sat_mode != SAT_OFF:
+                decided = prov.prove_with_sat(inputs + [negated])
+                if decided is not None:
+                    ok, lines = decided
+                    return ok, header + lines
+
+            overlay = {}
+            prov.kept = ChainMap(overlay, store)
+            ok, end_msg = self._prove_sos(prov, negated, overlay, budget, store, index, next_id)
+            derived = [cid for cid in sorted(overlay) if overlay[cid].parents is not None]
+            return ok, prov.render_trace(header, [end_msg] if end_msg else [], derived=derived)
+
+    def _prove_sos(self, prov, negated, overlay, budget, store, index, next_id):
+        """Cláusula dada restringida al conjunto de soporte (descendientes de la consulta).
+
+        `store`, `index` y `next_id` son la instantánea de la KB tomada en prove.
+        """
+        sigs = set()
+        sos_index, sos_done = {}, set()
+
+        def register(c):
+            nonlocal next_id
+            c.id = next_id
+            next_id += 1
+            overlay[c.id] = c
+            sigs.add(c.signature())
+            return c
+
+        queue = deque([register(negated)])
+        kb_ids = store.keys()
+        steps = 0
+        while queue:
+            g = queue.popleft()
+            partners = [store[i] for i in self._partners(g, index, kb_ids)]
+            partners += [overlay[i] for i in self._partners(g, sos_index, sos_done)]
+            sos_done.add(g.id)
+            for l in g.literals:
+                sos_index.setdefault((l.predicate, l.negated), set()).add(g.id)
+            for other in partners:
+                for r in prov.resolve_pair(g, other):
+                    if not r.literals:
+                        prov.empty = register(r)
+                        return True, None
+                    # Los duplicados de cláusulas de la KB se conservan: dentro del
+                    # conjunto de soporte sí se resuelven contra la KB
+                    sig = r.signature()
+                    if sig in sigs:
+                        continue
+                    queue.append(register(r))
+                    steps += 1
+                    if steps >= budget:
+                        return False, "Límite de pasos alcanzado. Deteniendo resolución."
+        return False, "No se pueden generar más resolventes. Fin del proceso."
+
+    # ---------- Información ----------
+    def describe(self):
+        with self.lock:
+            return {
+                'premises': {str(pid): text for pid, text in self.premises.items()},
+                'clauses': len(self.store),
+                'processed': len(self.processed),
+                'pending': sum(1 for cid in self.unprocessed if cid in self.store and cid not in self.processed),
+                'inconsistent': self.empty is not None,
+            }
@@ -0,0 +1,439 @@
+# sat.py
+import heapq
+import itertools
+
+from source.read import Term, Literal
+from source.inference import Clause, atom_key
+from source.stats import NULL_STATS
+
+
+# ---------- Solver CDCL ----------
+def luby(i):
+    """Término i (desde 1) de la secuencia de Luby: 1 1 2 1 1 2 4 ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while True:
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+
+
+class SATSolver:
+    """CDCL con literales vigilados, aprendizaje 1-UIP, VSIDS y reinicios de Luby.
+
+    Los literales son enteros DIMACS (±v). Cada cláusula original conserva su
+    índice; si la instancia es insatisfacible, `core` contiene los índices de
+    las cláusulas originales que participan en la refutación.
+    """
+
+    def __init__(self, stats=None, restart_base=100):
+        self.stats = stats or NULL_STATS
+        self.restart_base = restart_base
+        self.clauses = []      # listas de literales; [0] y [1] son los vigilados
+        self.sources = []      # None para originales; (índice, seguir literales) al aprender
+        self.num_original = 0
+        self.watches = {}
+        self.vals = [0]        # por variable: 0 sin asignar, 1 verdadero, -1 falso
+        self.level = [0]
+        self.reason = [None]
+        self.phase = [-1]
+        self.activity = [0.0]
+        self.heap = []
+        self.var_inc = 1.0
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.empty_clause = None
+        self.core = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+
+    # --- Construcción ---
+    def _ensure_var(self, v):
+        while len(self.vals) <= v:
+            n = len(self.vals)
+            self.vals.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.phase.append(-1)
+            self.activity.append(0.0)
+            heapq.heappush(self.heap, (0.0, n))
+
+    def add_clause(self, lits):
+        """Añade una cláusula original (antes de resolver) y devuelve su índice."""
+        if self.trail_lim:
+            raise ValueError("add_clause sólo puede usarse antes de solve()")
+        c, seen = [], set()
+        for l in lits:
+            self._ensure_var(abs(l))
+            if l not in seen:
+                seen.add(l)
+                c.append(l)
+        if any(-l in seen for l in c):
+            c = None  # tautología: siempre satisfecha, no se vigila
+        ci = len(self.clauses)
+        self.clauses.append(c)
+        self.sources.append(None)
+        self.num_original += 1
+        if c is not None and not c:
+            if self.empty_clause is None:
+                self.empty_clause = ci
+        elif c is not None and len(c) >= 2:
+            self._watch(c[0], ci)
+            self._watch(c[1], ci)
+        return ci
+
+    def _watch(self, lit, ci):
+        ws = self.watches.get(lit)
+        if ws is None:
+            self.watches[lit] = [ci]
+        else:
+            ws.append(ci)
+
+    # --- Asignación ---
+    def value(self, lit):
+        v = self.vals[abs(lit)]
+        return v if lit > 0 else -v
+
+    def _enqueue(self, lit, reason):
+        v = abs(lit)
+        self.vals[v] = 1 if lit > 0 else -1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """Propagación unitaria; devuelve el índice de una cláusula en conflicto o None."""
+        clauses, vals, trail = self.clauses, self.vals, self.trail
+        while self.qhead < len(trail):
+            false_lit = -trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            ws = self.watches.get(false_lit)
+            if not ws:
+                continue
+            keep = []
+            for idx, ci in enumerate(ws):
+                c = clauses[ci]
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], c[0]
+                first = c[0]
+                fv = vals[abs(first)]
+                if (fv if first > 0 else -fv) == 1:
+                    keep.append(ci)
+                    continue
+                for k in range(2, len(c)):
+                    lk = c[k]
+                    kv = vals[abs(lk)]
+                    if (kv if lk > 0 else -kv) != -1:
+                        c[1], c[k] = lk, c[1]
+                        self._watch(lk, ci)
+                        break
+                else:
+                    keep.append(ci)
+                    if (fv if first > 0 else -fv) == -1:
+                        keep.extend(ws[idx + 1:])
+                        self.watches[false_lit] = keep
+                        self.qhead = len(trail)
+                        return ci
+                    self._enqueue(first, ci)
+            self.watches[false_lit] = keep
+        return None
+
+    # --- Análisis de conflictos (1-UIP) ---
+    def _analyze(self, confl):
+        level, reason, trail = self.level, self.reason, self.trail
+        dl = len(self.trail_lim)
+        seen = set()
+        learnt = [0]
+        sources = []
+        counter = 0
+        p = None
+        idx = len(trail) - 1
+        ci = confl
+        while True:
+            sources.append((ci, False))
+            for q in self.clauses[ci]:
+                if q == p:
+                    continue
+                v = abs(q)
+                if v in seen:
+                    continue
+                seen.add(v)
+                if level[v] == 0:
+                    # Falso para siempre: se omite, pero su justificación (y la de
+                    # sus literales, también de nivel 0) cuenta para el núcleo
+                    if reason[v] is not None:
+                        sources.append((reason[v], True))
+                    continue
+                self._bump(v)
+                if level[v] == dl:
+                    counter += 1
+                else:
+                    learnt.append(q)
+            while abs(trail[idx]) not in seen:
+                idx -= 1
+            p = trail[idx]
+            idx -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            ci = reason[abs(p)]
+        learnt[0] = -p
+        bt = 0
+        if len(learnt) > 1:
+            best = max(range(1, len(learnt)), key=lambda k: level[abs(learnt[k])])
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            bt = level[abs(learnt[1])]
+        return learnt, bt, sources
+
+    def _bump(self, v):
+        self.activity[v] += self.var_inc
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(1, len(self.vals)) if self.vals[u] == 0]
+            heapq.heapify(self.heap)
+        if self.vals[v] == 0:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def _backtrack(self, lvl):
+        if len(self.trail_lim) <= lvl:
+            return
+        start = self.trail_lim[lvl]
+        for lit in self.trail[start:]:
+            v = abs(lit)
+            self.phase[v] = 1 if lit > 0 else -1
+            self.vals[v] = 0
+            self.reason[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[lvl:]
+        self.qhead = len(self.trail)
+
+    def _pick_branch(self):
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if self.vals[v] == 0:
+                return v
+        return None
+
+    # --- Núcleo insatisfacible ---
+    def _final_core(self, confl):
+        """Cláusulas originales que justifican el conflicto en nivel 0."""
+        core, stack, done = set(), [(confl, True)], set()
+        while stack:
+            ci, follow_lits = stack.pop()
+            if (ci, follow_lits) in done:
+                continue
+            done.add((ci, follow_lits))
+            if self.sources[ci] is None:
+                core.add(ci)
+            else:
+                # Las razones de nivel 0 se siguen hasta las cláusulas originales
+                stack.extend(self.sources[ci])
+            if follow_lits:
+                # Todos los literales de la cláusula son falsos en nivel 0
+                for q in self.clauses[ci]:
+                    r = self.reason[abs(q)]
+                    if r is not None and r != ci:
+                        stack.append((r, True))
+        return sorted(core)
+
+    # --- Bucle principal ---
+    def solve(self):
+        """True si es satisfacible (modelo en `model()`), False si no (núcleo en `core`)."""
+        st = self.stats
+        if self.empty_clause is not None:
+            self.core = [self.empty_clause]
+            return False
+        for ci in range(self.num_original):
+            c = self.clauses[ci]
+            if c is not None and len(c) == 1:
+                val = self.value(c[0])
+                if val == -1:
+                    self.core = self._final_core(ci)
+                    return False
+                if val == 0:
+                    self._enqueue(c[0], ci)
+
+        restart_i = 1
+        limit = self.restart_base * luby(restart_i)
+        since_restart = 0
+        while True:
+            confl = self._propagate()
+            if confl is not None:
+                self.conflicts += 1
+                since_restart += 1
+                if not self.trail_lim:
+                    self.core = self._final_core(confl)
+                    self._report(st)
+                    return False
+                learnt, bt, sources = self._analyze(confl)
+                self._backtrack(bt)
+                ci = len(self.clauses)
+                self.clauses.append(learnt)
+                self.sources.append(sources)
+                if len(learnt) > 1:
+                    self._watch(learnt[0], ci)
+                    self._watch(learnt[1], ci)
+                self._enqueue(learnt[0], ci)
+                self.var_inc /= 0.95
+                if since_restart >= limit:
+                    self.restarts += 1
+                    restart_i += 1
+                    limit = self.restart_base * luby(restart_i)
+                    since_restart = 0
+                    self._backtrack(0)
+            else:
+                v = self._pick_branch()
+                if v is None:
+                    self._report(st)
+                    return True
+                self.decisions += 1
+                self.trail_lim.append(len(self.trail))
+                self._enqueue(v if self.phase[v] > 0 else -v, None)
+
+    def _report(self, st):
+        if st.enabled:
+            st.incr('sat.conflicts', self.conflicts)
+            st.incr('sat.decisions', self.decisions)
+            st.incr('sat.propagations', self.propagations)
+            st.incr('sat.learned', len(self.clauses) - self.num_original)
+            st.incr('sat.restarts', self.restarts)
+
+    def model(self):
+        return {v: self.vals[v] == 1 for v in range(1, len(self.vals))}
+
+
+# ---------- Codificación de cláusulas ground ----------
+class GroundResult:
+    def __init__(self, sat, core=None, model=None):
+        self.sat = sat
+        self.core = core or []    # índices en la lista de cláusulas de entrada
+        self.model = model or {}  # átomo (Literal positivo) -> bool
+
+
+def solve_ground(clauses, stats=None):
+    """Decide un conjunto de cláusulas ground asignando un entero a cada átomo."""
+    st = stats or NULL_STATS
+    solver = SATSolver(stats=st)
+    index, atoms = {}, []
+    with st.phase('sat.encode'):
+        for c in clauses:
+            row = []
+            for l in c.literals:
+                k = atom_key(l)
+                v = index.get(k)
+                if v is None:
+                    atoms.append(Literal(l.predicate, l.terms))
+                    v = index[k] = len(atoms)
+                row.append(-v if l.negated else v)
+            solver.add_clause(row)
+    st.incr('sat.vars', len(atoms))
+    st.incr('sat.clauses', len(clauses))
+    with st.phase('sat.solve'):
+        sat = solver.solve()
+    if sat:
+        m = solver.model()
+        return GroundResult(True, model={a: m.get(v, False) for v, a in enumerate(atoms, 1)})
+    return GroundResult(False, core=solver.core)
+
+
+# ---------- Generación de instancias (Herbrand + SAT) ----------
+def _clause_vars(c):
+    out = []
+
+    def walk(t):
+        if t.type == 'variable':
+            if t.value not in out:
+                out.append(t.value)
+        elif t.type == 'function':
+            for a in t.args:
+                walk(a)
+
+    for l in c.literals:
+        for t in l.terms:
+            walk(t)
+    return out
+
+
+def _signature(clauses):
+    consts, funcs = {}, {}
+
+    def walk(t):
+        if t.type == 'constant':
+            consts[t.value] = t
+        elif t.type == 'function':
+            funcs[t.value] = len(t.args)
+            for a in t.args:
+                walk(a)
+
+    for c in clauses:
+        for l in c.literals:
+            for t in l.terms:
+                walk(t)
+    return list(consts.values()), funcs
+
+
+def herbrand_universe(clauses, depth):
+    """Términos ground con anidamiento de funciones hasta `depth`."""
+    consts, funcs = _signature(clauses)
+    universe = consts or [Term('constant', 'C')]
+    for _ in range(depth):
+        new = list(universe)
+        for f, arity in funcs.items():
+            for args in itertools.product(universe, repeat=arity):
+                new.append(Term('function', f, list(args)))
+        universe = new
+    return universe
+
+
+def _subst_term(t, env):
+    if t.type == 'variable':
+        return env.get(t.value, t)
+    if t.type == 'function':
+        return Term('function', t.value, [_subst_term(a, env) for a in t.args])
+    return t
+
+
+def instance_generation(clauses, max_depth=1, max_instances=20000, stats=None):
+    """Instancia las cláusulas sobre el universo de Herbrand y decide con SAT.
+
+    Devuelve (resultado, instancias, origen) con origen[k] = índice de la
+    cláusula de entrada de la instancia k. resultado es None si se agota el
+    presupuesto sin decidir. Sin símbolos de función el universo es finito y
+    un resultado satisfacible es definitivo.
+    """
+    st = stats or NULL_STATS
+    _, funcs = _signature(clauses)
+    variables = [_clause_vars(c) for c in clauses]
+    for depth in range(0, max_depth + 1):
+        universe = herbrand_universe(clauses, depth)
+        total = sum(len(universe) ** len(vs) for vs in variables)
+        if total > max_instances:
+            st.incr('instgen.budget_exceeded')
+            return None, [], []
+        instances, origin = [], []
+        with st.phase('instgen.instantiate'):
+            for ci, (c, vs) in enumerate(zip(clauses, variables)):
+                for combo in itertools.product(universe, repeat=len(vs)):
+                    env = dict(zip(vs, combo))
+                    instances.append(Clause([Literal(l.predicate, [_subst_term(t, env) for t in l.terms],
+                                                     l.negated) for l in c.literals]))
+                    origin.append(ci)
+        st.incr('instgen.rounds')
+        st.incr('instgen.instances', len(instances))
+        result = solve_ground(instances, st)
+        if not result.sat:
+            return result, instances, origin
+        if not funcs:
+            return result, instances, origin
+    return None, [], []
+
@@ -0,0 +1,338 @@
+# server.py
+"""Servidor de larga duración con sesiones de KB residentes.
+
+Cada sesión es una KnowledgeBase incremental (source/kb.py): añadir una
+premisa reanuda la saturación y retractarla sólo elimina lo que dependía de
+ella.
+
+Protocolo JSON: cada petición es un objeto con "op" y, según la operación,
+"session", "premises", "path", "formula", "premise", "query", "trace", "sat",
+"max_steps" y "stats". La respuesta es {"id", "ok": true, "result"} o
+{"id", "ok": false, "error"}.
+
+    python -m source.server --unix /tmp/prover.sock --workers 4
+    python -m source.server --http 127.0.0.1:8765 --load amistad=data/amistad.txt
+
+Los clientes sólo pueden cargar archivos ("path") dentro de --data-dir; sin
+esa opción la carga remota de archivos está desactivada.
+"""
+import argparse
+import json
+import os
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from source.read import read_formulas_from_file, parse_single_formula
+from source.inference import Clause, TRACE_PROOF, SAT_AUTO, SAT_OFF, SAT_INSTGEN
+from source.kb import KnowledgeBase
+from source.stats import Stats
+from source.tptp import parse_tptp
+
+
+class RequestError(Exception):
+    """Error de la petición (se devuelve al cliente, no detiene el servidor)."""
+
+
+# ---------- Sesiones ----------
+class Session:
+    """KB con nombre, residente con sus cláusulas, índices y estado de saturación.
+
+    Las modificaciones de una misma sesión se serializan con el cerrojo de la
+    KB; las consultas trabajan sobre una instantánea y se solapan entre sí.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.kb = KnowledgeBase()
+
+    def add_premise(self, text, saturate=True):
+        return self.kb.add_premise(text, saturate)
+
+    def add_clause(self, clause, saturate=True):
+        return self.kb.add_clause(clause, saturate)
+
+    def retract(self, pid):
+        try:
+            return self.kb.retract(pid)
+        except ValueError:
+            raise RequestError(f"la sesión {self.name} no tiene la premisa {pid}")
+
+    def prove(self, query, trace_level=TRACE_PROOF, sat_mode=None, max_steps=500, with_stats=False):
+        q = parse_single_formula(query)
+        if q.type != 'literal':
+            raise RequestError("la consulta debe ser una fórmula literal simple")
+        stats = Stats() if with_stats else None
+        ok, trace = self.kb.prove(Clause([q.content]), max_steps=max_steps, trace_level=trace_level,
+                                  sat_mode=sat_mode, stats=stats)
+        out = {'proved': ok, 'trace': trace}
+        if stats is not None:
+            out['stats'] = stats.as_dict()
+        return out
+
+    def describe(self):
+        out = {'name': self.name}
+        out.update(self.kb.describe())
+        return out
+
+
+def load_session(name, path):
+    """Crea una sesión desde un archivo: TPTP (.p/.tptp/.ax) o una premisa por línea.
+
+    Como en data/*.txt, la última línea es la pregunta y no se añade como premisa.
+    Los errores de parseo no repiten el contenido del archivo.
+    """
+    txt = read_formulas_from_file(path)
+    if txt is None:
+        raise RequestError(f"no se pudo leer {path}")
+    session = Session(name)
+    if os.path.splitext(path)[1].lower() in ('.p', '.tptp', '.ax'):
+        try:
+            problem = parse_tptp(txt)
+        except ValueError:
+            raise RequestError(f"{path} no es un problema TPTP válido")
+        for fm in problem.formulas:
+            session.kb.add_premise(fm, saturate=False)
+        for c in problem.clauses:
+            session.add_clause(c, saturate=False)
+    else:
+        lines = [ln.strip() for ln in txt.splitlines() if ln.strip()]
+        for n, ln in enumerate(lines[:-1], 1):
+            try:
+                session.add_premise(ln, saturate=False)
+            except ValueError:
+                raise RequestError(f"{path}: la premisa {n} no es una fórmula válida")
+    session.kb.saturate()
+    return session
+
+
+# ---------- Servicio (independiente del transporte) ----------
+class ProverService:
+    def __init__(self, workers=4, data_dir=None):
+        self.sessions = {}
+        self.data_dir = os.path.realpath(data_dir) if data_dir else None
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prover')
+
+    def submit(self, request):
+        """Encola la petición en el pool; devuelve un Future con la respuesta."""
+        return self.pool.submit(self.handle, request)
+
+    def handle(self, request):
+        rid = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise RequestError("la petición debe ser un objeto JSON")
+            return {'id': rid, 'ok': True, 'result': self._dispatch(request)}
+        except KeyError as e:
+            return {'id': rid, 'ok': False, 'error': f"falta el campo {e}"}
+        except (RequestError, ValueError) as e:
+            return {'id': rid, 'ok': False, 'error': str(e)}
+        except Exception as e:
+            # Cualquier otro fallo también se responde: el cliente no queda esperando
+            return {'id': rid, 'ok': False, 'error': f"error interno: {type(e).__name__}: {e}"}
+
+    def _data_path(self, path):
+        """Ruta de un archivo pedido por un cliente, restringida a data_dir."""
+        if self.data_dir is None:
+            raise RequestError("la carga de archivos está desactivada (inicie el servidor con --data-dir)")
+        full = os.path.realpath(os.path.join(self.data_dir, str(path)))
+        if os.path.commonpath([full, self.data_dir]) != self.data_dir:
+            raise RequestError(f"ruta fuera del directorio de datos: {path}")
+        return full
+
+    def _session(self, request):
+        name = request.get('session')
+        with self.lock:
+            session = self.sessions.get(name)
+        if session is None:
+            raise RequestError(f"sesión desconocida: {name}")
+        return session
+
+    def _dispatch(self, req):
+        op = req.get('op')
+        if op == 'ping':
+            return 'pong'
+        if op == 'list':
+            with self.lock:
+                return sorted(self.sessions)
+        if op == 'create':
+            name = req.get('session')
+            if not name:
+                raise RequestError("falta 'session'")
+            if 'path' in req:
+                session = load_session(name, self._data_path(req['path']))
+            else:
+                session = Session(name)
+                for text in req.get('premises', []):
+                    session.add_premise(text, saturate=False)
+                session.kb.saturate()
+            with self.lock:
+                if name in self.sessions and not req.get('replace'):
+                    raise RequestError(f"la sesión {name} ya existe")
+                self.sessions[name] = session
+            return session.describe()
+        if op == 'drop':
+            with self.lock:
+                if self.sessions.pop(req.get('session'), None) is None:
+                    raise RequestError(f"sesión desconocida: {req.get('session')}")
+            return None
+        if op == 'describe':
+            return self._session(req).describe()
+        if op == 'add':
+            return {'premise': self._session(req).add_premise(req['formula'])}
+        if op == 'retract':
+            return {'removed': self._session(req).retract(int(req['premise']))}
+        if op == 'saturate':
+            return {'added': self._session(req).kb.saturate(req.get('max_steps'))}
+        if op == 'prove':
+            # Sin "sat" se usa el modo de la KB: conjunto de soporte incremental
+            sat = req.get('sat')
+            if sat not in (None, SAT_AUTO, SAT_OFF, SAT_INSTGEN):
+                raise RequestError(f"modo SAT desconocido: {sat}")
+            return self._session(req).prove(req['query'], int(req.get('trace', TRACE_PROOF)), sat,
+                                            int(req.get('max_steps', 500)), bool(req.get('stats')))
+        raise RequestError(f"operación desconocida: {op}")
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+
+# ---------- Transporte: socket Unix (una petición JSON por línea) ----------
+class _LineHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        service = self.server.service
+        write_lock = threading.Lock()
+        written = threading.Semaphore(0)
+        pending = 0
+
+        def send(payload):
+            data = (json.dumps(payload, ensure_ascii=False) + "\n").encode('utf-8')
+            with write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except OSError:
+                    pass
+
+        def reply(future):
+            try:
+                send(future.result())
+            finally:
+                written.release()
+
+        # Las peticiones de una misma conexión se atienden en paralelo;
+        # el cliente empareja las respuestas por "id".
+        for raw in self.rfile:
+            line = raw.decode('utf-8').strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                send({'id': None, 'ok': False, 'error': f"JSON inválido: {e}"})
+                continue
+            service.submit(request).add_done_callback(reply)
+            pending += 1
+        # No cerrar la conexión hasta haber escrito todas las respuestas
+        for _ in range(pending):
+            written.acquire()
+
+
+class UnixProverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _LineHandler)
+        self.service = service
+
+
+# ---------- Transporte: HTTP (POST con el objeto JSON) ----------
+class _HTTPHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError as e:
+            return self._send(400, {'id': None, 'ok': False, 'error': f"JSON inválido: {e}"})
+        response = self.server.service.submit(request).result()
+        self._send(200 if response['ok'] else 400, response)
+
+    def do_GET(self):
+        if self.path.rstrip('/') in ('', '/sessions'):
+            return self._send(200, self.server.service.handle({'op': 'list'}))
+        self._send(404, {'id': None, 'ok': False, 'error': "ruta desconocida"})
+
+    def _send(self, code, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class HTTPProverServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, _HTTPHandler)
+        self.service = service
+
+
+# ---------- Cliente mínimo ----------
+def unix_request(path, request):
+    """Envía una petición por el socket Unix y devuelve la respuesta decodificada."""
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(path)
+        s.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode('utf-8'))
+        s.shutdown(socket.SHUT_WR)
+        with s.makefile('r', encoding='utf-8') as f:
+            return json.loads(f.readline())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor del motor de resolución")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--unix', metavar='RUTA', help="escucha en un socket Unix")
+    group.add_argument('--http', metavar='HOST:PUERTO', help="escucha en HTTP")
+    parser.add_argument('--workers', type=int, default=4, help="tamaño del pool de pruebas")
+    parser.add_argument('--load', action='append', default=[], metavar='NOMBRE=ARCHIVO',
+                        help="precarga una sesión (repetible)")
+    parser.add_argument('--data-dir', metavar='DIR',
+                        help="directorio del que los clientes pueden cargar archivos con \"path\"")
+    args = parser.parse_args(argv)
+
+    service = ProverService(workers=args.workers, data_dir=args.data_dir)
+    for spec in args.load:
+        name, _, path = spec.partition('=')
+        service.sessions[name] = load_session(name, path)
+
+    if args.unix:
+        server = UnixProverServer(args.unix, service)
+        where = args.unix
+    else:
+        host, _, port = args.http.rpartition(':')
+        server = HTTPProverServer((host or '127.0.0.1', int(port)), service)
+        where = f"http://{host or '127.0.0.1'}:{port}"
+    print(f"Servidor escuchando en {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# stats.py
+import json
+import sys
+import threading
+import time
+
+
+# ---------- Estadísticas por fase ----------
+class Stats:
+    """Contadores y cronómetros por fase del pipeline (parseo, FNC, índices, resolución).
+
+    Se pasa opcionalmente a FNCConverter y ResolutionProver. Si no se pasa,
+    se usa NULL_STATS, cuyas operaciones no hacen nada.
+    """
+    enabled = True
+
+    def __init__(self, profiler=None):
+        self.counters = {}
+        self.timers = {}
+        self.profiler = profiler
+        self._stack = []
+
+    def incr(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        t = self.timers.get(name)
+        if t is None:
+            self.timers[name] = [seconds, 1]
+        else:
+            t[0] += seconds
+            t[1] += 1
+
+    def phase(self, name):
+        """Context manager que acumula el tiempo de la fase `name`."""
+        return _PhaseTimer(self, name)
+
+    def current_phase(self):
+        return self._stack[-1] if self._stack else None
+
+    # --- Perfilador de muestreo opcional ---
+    def start(self):
+        if self.profiler is not None:
+            self.profiler.start(self)
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    # --- Exportación ---
+    def as_dict(self):
+        out = {
+            'counters': dict(sorted(self.counters.items())),
+            'timers': {k: {'seconds': round(v[0], 6), 'calls': v[1]}
+                       for k, v in sorted(self.timers.items())},
+        }
+        if self.profiler is not None:
+            out['profile'] = self.profiler.as_dict()
+        return out
+
+    def to_json(self, indent=2):
+        return json.dumps(self.as_dict(), ensure_ascii=False, indent=indent)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json() + "\n")
+
+
+class _PhaseTimer:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.stats._stack.append(self.name)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add_time(self.name, time.perf_counter() - self.t0)
+        self.stats._stack.pop()
+        return False
+
+
+class NullStats:
+    """Implementación vacía: coste prácticamente nulo cuando no se perfila."""
+    enabled = False
+    profiler = None
+
+    def incr(self, name, n=1):
+        pass
+
+    def add_time(self, name, seconds):
+        pass
+
+    def phase(self, name):
+        return _NULL_TIMER
+
+    def current_phase(self):
+        return None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def as_dict(self):
+        return {}
+
+    def to_json(self, indent=2):
+        return "{}"
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+NULL_STATS = NullStats()
+
+
+# ---------- Perfilador de muestreo ----------
+class SamplingProfiler:
+    """Muestrea periódicamente la pila del hilo que lo arranca.
+
+    Cada muestra se atribuye a la fase activa de Stats y a la función que se
+    está ejecutando. Cualquier objeto con start(stats)/stop()/as_dict() puede
+    usarse como perfilador en su lugar (p. ej. un adaptador a otra herramienta).
+    """
+
+    def __init__(self, interval=0.001, top=20):
+        self.interval = interval
+        self.top = top
+        self.samples = 0
+        self.by_phase = {}
+        self.by_function = {}
+        self._thread = None
+        self._running = False
+
+    def start(self, stats):
+        if self._thread is not None:
+            return
+        target = threading.get_ident()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(stats, target), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, stats, target):
+        while self._running:
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+            phase = stats.current_phase() or '-'
+            code = frame.f_code
+            func = f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}"
+            self.samples += 1
+            self.by_phase[phase] = self.by_phase.get(phase, 0) + 1
+            self.by_function[func] = self.by_function.get(func, 0) + 1
+
+    def as_dict(self):
+        top = sorted(self.by_function.items(), key=lambda kv: -kv[1])[:self.top]
+        return {
+            'interval': self.interval,
+            'samples': self.samples,
+            'by_phase': dict(sorted(self.by_phase.items(), key=lambda kv: -kv[1])),
+            'top_functions': dict(top),
+        }
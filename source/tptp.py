@@ -0,0 +1,364 @@
+# tptp.py
+import re
+
+from source.read import Term, Literal, Formula
+from source.inference import Clause, ResolutionProver, atom_key, is_ground_clause
+
+# ---------- Léxico TPTP ----------
+_TOKEN_RE = re.compile(r"""
+    (?P<skip>\s+|%[^\n]*|/\*.*?\*/)
+  | (?P<op><~>|<=>|=>|<=|~\||~&|!=|[=~|&!?()\[\],:.])
+  | (?P<word>\$?\$?[a-z][A-Za-z0-9_]*|[A-Z][A-Za-z0-9_]*|'(?:[^'\\]|\\.)*'|[+-]?[0-9]+(?:\.[0-9]+)?)
+""", re.VERBOSE | re.DOTALL)
+
+_LOWER_WORD = re.compile(r'^[a-z][A-Za-z0-9_]*$')
+_SYMBOL = re.compile(r'^[A-Za-z0-9_]+$')
+
+_PREMISE_ROLES = ('axiom', 'hypothesis', 'definition', 'assumption', 'lemma', 'theorem',
+                  'corollary', 'plain', 'unknown')
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise ValueError(f"TPTP: carácter inesperado en posición {pos}: {text[pos:pos + 20]!r}")
+        pos = m.end()
+        if m.lastgroup != 'skip':
+            tokens.append(m.group())
+    return tokens
+
+
+# ---------- Conversión de nombres ----------
+# TPTP usa Mayúscula para variables y minúscula para constantes/predicados;
+# este motor usa la convención inversa.
+def _var_name(tok):
+    return tok[0].lower() + tok[1:]
+
+def _sym_name(tok):
+    if tok.startswith("'"):
+        tok = tok[1:-1]
+    if not _SYMBOL.match(tok):
+        raise ValueError(f"TPTP: símbolo no representable: {tok!r}")
+    return tok[0].upper() + tok[1:]
+
+def _tptp_var(name):
+    return name[0].upper() + name[1:]
+
+def _tptp_sym(name):
+    low = name[0].lower() + name[1:]
+    return low if _LOWER_WORD.match(low) else "'" + name.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+class TPTPProblem:
+    """Resultado de importar un problema TPTP.
+
+    formulas / conjectures: Formula de las entradas fof.
+    clauses / negated_conjectures: Clause de las entradas cnf.
+    """
+
+    def __init__(self):
+        self.formulas = []
+        self.conjectures = []
+        self.clauses = []
+        self.negated_conjectures = []
+
+    def question(self):
+        """Literal a probar por refutación, si el problema tiene exactamente uno."""
+        if len(self.conjectures) == 1 and not self.negated_conjectures:
+            q = self.conjectures[0]
+            return q if q.type == 'literal' else None
+        if len(self.negated_conjectures) == 1 and not self.conjectures:
+            lits = self.negated_conjectures[0].literals
+            if len(lits) == 1:
+                l = lits[0]
+                return Formula('literal', Literal(l.predicate, l.terms, not l.negated))
+        return None
+
+
+# ---------- Parser ----------
+class _Parser:
+    def __init__(self, tokens):
+        self.toks = tokens
+        self.i = 0
+        self.cnf_count = 0
+        self.var_suffix = ""
+
+    def peek(self):
+        return self.toks[self.i] if self.i < len(self.toks) else None
+
+    def next(self):
+        tok = self.peek()
+        if tok is None:
+            raise ValueError("TPTP: fin de entrada inesperado")
+        self.i += 1
+        return tok
+
+    def expect(self, tok):
+        got = self.next()
+        if got != tok:
+            raise ValueError(f"TPTP: se esperaba {tok!r} y se encontró {got!r}")
+
+    # --- Entradas de nivel superior ---
+    def parse_problem(self):
+        problem = TPTPProblem()
+        while self.peek() is not None:
+            kind = self.next()
+            if kind == 'include':
+                raise ValueError("TPTP: include(...) no está soportado; concatene los archivos")
+            if kind not in ('fof', 'cnf'):
+                raise ValueError(f"TPTP: tipo de entrada no soportado: {kind}")
+            self.expect('(')
+            self.next()  # nombre
+            self.expect(',')
+            role = self.next()
+            self.expect(',')
+            if kind == 'fof':
+                f = self.parse_formula()
+                if role == 'conjecture':
+                    problem.conjectures.append(f)
+                elif role in _PREMISE_ROLES:
+                    problem.formulas.append(f)
+                elif role == 'negated_conjecture':
+                    problem.formulas.append(f)
+                else:
+                    raise ValueError(f"TPTP: rol no soportado: {role}")
+            else:
+                # Las variables de cnf son locales a la cláusula, pero el motor no
+                # renombra entre cláusulas: se separan con el índice de la entrada
+                self.cnf_count += 1
+                self.var_suffix = f"_{self.cnf_count}"
+                c = Clause(self._clause_literals(self.parse_formula()))
+                self.var_suffix = ""
+                if role == 'negated_conjecture':
+                    problem.negated_conjectures.append(c)
+                elif role == 'conjecture':
+                    raise ValueError("TPTP: cnf con rol conjecture; use negated_conjecture")
+                else:
+                    problem.clauses.append(c)
+            self._skip_annotations()
+            self.expect(')')
+            self.expect('.')
+        return problem
+
+    def _skip_annotations(self):
+        """Tras la fórmula sólo puede venir ')' o ', <anotaciones>'; éstas se ignoran."""
+        tok = self.peek()
+        if tok == ')':
+            return
+        if tok != ',':
+            raise ValueError(f"TPTP: se esperaba ',' o ')' tras la fórmula y se encontró {tok!r}")
+        self.next()
+        depth = 0
+        while True:
+            tok = self.peek()
+            if tok is None:
+                return
+            if depth == 0 and tok == ')':
+                return
+            if tok in ('(', '['):
+                depth += 1
+            elif tok in (')', ']'):
+                depth -= 1
+            self.i += 1
+
+    # --- Fórmulas ---
+    def parse_formula(self):
+        left = self.parse_unitary()
+        op = self.peek()
+        if op in ('&', '|'):
+            conn = '∧' if op == '&' else '∨'
+            while self.peek() == op:
+                self.next()
+                left = Formula('connective', conn, [left, self.parse_unitary()])
+            return left
+        if op in ('=>', '<=', '<=>', '<~>', '~|', '~&'):
+            self.next()
+            right = self.parse_unitary()
+            if op == '=>':
+                return Formula('connective', '→', [left, right])
+            if op == '<=':
+                return Formula('connective', '→', [right, left])
+            if op == '<=>':
+                return Formula('connective', '↔', [left, right])
+            if op == '<~>':
+                return _negate(Formula('connective', '↔', [left, right]))
+            if op == '~|':
+                return _negate(Formula('connective', '∨', [left, right]))
+            return _negate(Formula('connective', '∧', [left, right]))
+        return left
+
+    def parse_unitary(self):
+        tok = self.peek()
+        if tok == '(':
+            self.next()
+            f = self.parse_formula()
+            self.expect(')')
+            return f
+        if tok == '~':
+            self.next()
+            return _negate(self.parse_unitary())
+        if tok in ('!', '?'):
+            self.next()
+            q = '∀' if tok == '!' else '∃'
+            self.expect('[')
+            variables = [self.next()]
+            while self.peek() == ',':
+                self.next()
+                variables.append(self.next())
+            self.expect(']')
+            self.expect(':')
+            body = self.parse_unitary()
+            for v in reversed(variables):
+                body = Formula('quantifier', q, [body], _var_name(v))
+            return body
+        return self.parse_atom()
+
+    def parse_atom(self):
+        tok = self.next()
+        if tok.startswith('$'):
+            raise ValueError(f"TPTP: símbolo definido no soportado: {tok}")
+        if tok[0].isupper():
+            raise ValueError(f"TPTP: se esperaba un átomo y se encontró la variable {tok}")
+        terms = self._args()
+        if self.peek() in ('=', '!='):
+            raise ValueError("TPTP: la igualdad no está soportada por este motor")
+        return Formula('literal', Literal(_sym_name(tok), terms))
+
+    def _args(self):
+        if self.peek() != '(':
+            return []
+        self.next()
+        terms = [self.parse_term()]
+        while self.peek() == ',':
+            self.next()
+            terms.append(self.parse_term())
+        self.expect(')')
+        return terms
+
+    def parse_term(self):
+        tok = self.next()
+        if tok[0].isupper():
+            return Term('variable', _var_name(tok) + self.var_suffix)
+        if tok.startswith('$') or tok.startswith('"'):
+            raise ValueError(f"TPTP: término no soportado: {tok}")
+        args = self._args()
+        if args:
+            return Term('function', _sym_name(tok), args)
+        return Term('constant', _sym_name(tok))
+
+    def _clause_literals(self, f):
+        lits = []
+
+        def walk(n):
+            if n.type == 'connective' and n.content == '∨':
+                walk(n.children[0])
+                walk(n.children[1])
+            elif n.type == 'literal':
+                lits.append(n.content)
+            else:
+                raise ValueError(f"TPTP: la cláusula cnf no es una disyunción de literales: {f}")
+
+        walk(f)
+        return lits
+
+
+def _negate(f):
+    if f.type == 'literal':
+        lit = f.content
+        return Formula('literal', Literal(lit.predicate, lit.terms, not lit.negated))
+    return Formula('connective', '¬', [f])
+
+
+def parse_tptp(text):
+    """Importa entradas fof/cnf de un texto TPTP."""
+    return _Parser(_tokenize(text)).parse_problem()
+
+
+# ---------- Exportación TPTP CNF ----------
+def _term_to_tptp(t):
+    if t.type == 'variable':
+        return _tptp_var(t.value)
+    if t.type == 'function':
+        return f"{_tptp_sym(t.value)}({','.join(_term_to_tptp(a) for a in t.args)})"
+    return _tptp_sym(t.value)
+
+def literal_to_tptp(l):
+    atom = _tptp_sym(l.predicate)
+    if l.terms:
+        atom += f"({','.join(_term_to_tptp(t) for t in l.terms)})"
+    return f"~ {atom}" if l.negated else atom
+
+def clause_to_tptp(c, name, role='axiom'):
+    body = " | ".join(literal_to_tptp(l) for l in c.literals) if c.literals else "$false"
+    return f"cnf({name}, {role}, ({body}))."
+
+def clauses_to_tptp(clauses, negated_conjectures=()):
+    """Exporta un conjunto de cláusulas como problema TPTP CNF."""
+    lines = ["% Conjunto de cláusulas en TPTP CNF"]
+    for i, c in enumerate(clauses, 1):
+        lines.append(clause_to_tptp(c, f"c{i}"))
+    for i, c in enumerate(negated_conjectures, 1):
+        lines.append(clause_to_tptp(c, f"nc{i}", 'negated_conjecture'))
+    return "\n".join(lines) + "\n"
+
+
+# ---------- DIMACS (entradas proposicionales / ground) ----------
+def clauses_to_dimacs(clauses):
+    """Exporta cláusulas ground a DIMACS CNF.
+
+    Devuelve (texto, átomos), donde átomos[k - 1] es el literal positivo de la
+    variable k. La correspondencia también se escribe como comentarios 'c'.
+    """
+    index, atoms, rows = {}, [], []
+    for c in clauses:
+        if not is_ground_clause(c):
+            raise ValueError(f"DIMACS: la cláusula no es ground: {c}")
+        row = []
+        for l in c.literals:
+            k = atom_key(l)
+            v = index.get(k)
+            if v is None:
+                atoms.append(Literal(l.predicate, l.terms))
+                v = index[k] = len(atoms)
+            row.append(-v if l.negated else v)
+        rows.append(row)
+    lines = [f"c {v} {a}" for v, a in enumerate(atoms, 1)]
+    lines.append(f"p cnf {len(atoms)} {len(rows)}")
+    lines += [" ".join(str(x) for x in row) + " 0" for row in rows]
+    return "\n".join(lines) + "\n", atoms
+
+
+def parse_dimacs(text):
+    """Importa DIMACS CNF. Usa los comentarios 'c <n> <átomo>' si existen; si no, V<n>()."""
+    names, clauses, cur = {}, [], []
+    prov = ResolutionProver()
+    for line in text.splitlines():
+        ln = line.strip()
+        if not ln or ln.startswith('%'):
+            continue
+        if ln.startswith('c'):
+            parts = ln.split(None, 2)
+            if len(parts) == 3 and parts[1].isdigit() and '(' in parts[2]:
+                names[int(parts[1])] = prov.parse_clause_from_string(parts[2]).literals[0]
+            continue
+        if ln.startswith('p'):
+            continue
+        for tok in ln.split():
+            v = int(tok)
+            if v == 0:
+                clauses.append(cur)
+                cur = []
+            else:
+                cur.append(v)
+    if cur:
+        clauses.append(cur)
+
+    def lit(v):
+        a = names.get(abs(v))
+        if a is None:
+            return Literal(f"V{abs(v)}", [], v < 0)
+        return Literal(a.predicate, a.terms, v < 0)
+
+    return [Clause([lit(v) for v in row]) for row in clauses]
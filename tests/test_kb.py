@@ -0,0 +1,87 @@
+# test_kb.py
+import random
+import unittest
+
+from source.kb import KnowledgeBase
+
+ATOMS = ["P(A)", "Q(A)", "R(A)", "S(A)"]
+
+
+def random_premise(rng):
+    a, b = rng.sample(ATOMS, 2)
+    return rng.choice([a, f"{a} → {b}", f"{a} ∨ {b}", f"{a} → ¬{b}", f"∀x ({a[0]}(x) → {b[0]}(x))"])
+
+
+def signatures(kb):
+    return {c.signature() for c in kb.store.values()}
+
+
+class RetractionTest(unittest.TestCase):
+    def test_matches_rebuilt_kb(self):
+        """Tras altas y retracciones aleatorias, la KB coincide con una reconstruida."""
+        for seed in range(150):
+            rng = random.Random(seed)
+            kb = KnowledgeBase(max_steps=10 ** 6)
+            live = {}
+            for _ in range(10):
+                if live and rng.random() < 0.4:
+                    pid = rng.choice(sorted(live))
+                    kb.retract(pid)
+                    del live[pid]
+                else:
+                    text = random_premise(rng)
+                    live[kb.add_premise(text)] = text
+            fresh = KnowledgeBase(max_steps=10 ** 6)
+            for text in live.values():
+                fresh.add_premise(text)
+
+            self.assertEqual(kb.empty is None, fresh.empty is None, seed)
+            if kb.empty is None:
+                self.assertEqual(signatures(kb), signatures(fresh), seed)
+            for a in ATOMS:
+                self.assertEqual(kb.prove(a)[0], fresh.prove(a)[0], (seed, a))
+                kb.prove(a, trace_level=3)
+
+    def test_alternative_justification_survives(self):
+        kb = KnowledgeBase()
+        kb.add_premise("P(A)")
+        rule = kb.add_premise("P(A) → Q(A)")
+        kb.add_premise("Q(A)")
+        self.assertEqual(kb.retract(rule), 1)   # sólo desaparece ¬P(A) ∨ Q(A)
+        self.assertTrue(kb.prove("Q(A)")[0])
+
+    def test_retract_resumes_saturation(self):
+        kb = KnowledgeBase()
+        kb.add_premise("S(A)")
+        p = kb.add_premise("¬S(A)")
+        kb.add_premise("S(A) → R(A)")          # no se procesa: la KB ya es inconsistente
+        kb.retract(p)
+        self.assertIsNone(kb.empty)
+        self.assertIn("R(A)", {str(c) for c in kb.store.values()})
+
+    def test_inconsistent_kb_full_trace(self):
+        kb = KnowledgeBase()
+        kb.add_premise("P(A)")
+        kb.add_premise("¬P(A)")
+        ok, trace = kb.prove("Q(A)", trace_level=3)
+        self.assertTrue(ok)
+        self.assertIn("La KB es inconsistente: □ ya se deriva de las premisas.", trace)
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_query_snapshot_is_not_mutated(self):
+        kb = KnowledgeBase()
+        kb.add_premise("∀x (P(x) → Q(x))")
+        pid = kb.add_premise("P(A)")
+        kb.prove("Q(A)")
+        store, index = kb.store, kb.index
+        before = (dict(store), {k: set(v) for k, v in index.items()})
+        kb.add_premise("P(B)")
+        kb.retract(pid)
+        self.assertEqual((store, index), before)
+        self.assertTrue(kb.prove("Q(B)")[0])
+        self.assertFalse(kb.prove("Q(A)")[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
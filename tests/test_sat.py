@@ -0,0 +1,43 @@
+# test_sat.py
+import itertools
+import random
+import unittest
+
+from source.sat import SATSolver
+
+
+def brute_force_sat(clauses, n):
+    for bits in itertools.product((False, True), repeat=n):
+        if all(any(bits[abs(l) - 1] == (l > 0) for l in c) for c in clauses):
+            return True
+    return False
+
+
+def solve(clauses):
+    solver = SATSolver(restart_base=2)
+    for c in clauses:
+        solver.add_clause(c)
+    return solver.solve(), solver.core
+
+
+class UnsatCoreTest(unittest.TestCase):
+    def test_core_follows_level0_reasons(self):
+        clauses = [[1], [-1, 2], [-2, 3, 4], [-2, 3, -4], [-3, 5], [-3, -5]]
+        sat, core = solve(clauses)
+        self.assertFalse(sat)
+        self.assertEqual(core, [0, 1, 2, 3, 4, 5])
+
+    def test_random_cores_are_unsat(self):
+        rng = random.Random(1234)
+        for _ in range(3000):
+            n = rng.randint(2, 8)
+            clauses = [[rng.choice((-1, 1)) * rng.randint(1, n) for _ in range(rng.randint(1, 4))]
+                       for _ in range(rng.randint(1, 5 * n))]
+            sat, core = solve(clauses)
+            self.assertEqual(sat, brute_force_sat(clauses, n), clauses)
+            if not sat:
+                self.assertFalse(brute_force_sat([clauses[i] for i in core], n), (clauses, core))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# test_tptp.py
+import unittest
+
+from source.inference import ResolutionProver
+from source.tptp import parse_tptp, clauses_to_tptp, clauses_to_dimacs, parse_dimacs
+
+
+def variables(clause):
+    out = set()
+
+    def walk(t):
+        if t.type == 'variable':
+            out.add(t.value)
+        for a in t.args or ():
+            walk(a)
+
+    for l in clause.literals:
+        for t in l.terms:
+            walk(t)
+    return out
+
+
+class ImportTest(unittest.TestCase):
+    def test_fof(self):
+        problem = parse_tptp("""
+            fof(ax1, axiom, ! [X] : (human(X) => mortal(X))).
+            fof(ax2, axiom, human(socrates), file('x', y)).
+            fof(goal, conjecture, mortal(socrates)).
+        """)
+        self.assertEqual([str(f) for f in problem.formulas],
+                         ['∀x ((Human(x) → Mortal(x)))', 'Human(Socrates)'])
+        self.assertEqual(str(problem.question()), 'Mortal(Socrates)')
+
+    def test_cnf(self):
+        problem = parse_tptp("""
+            cnf(c1, axiom, ~ p(X) | q(f(g(X)), a)).
+            cnf(c2, negated_conjecture, ~ q(Y, a)).
+        """)
+        self.assertEqual([str(c) for c in problem.clauses], ['¬P(x_1) ∨ Q(F(G(x_1)), A)'])
+        self.assertEqual(str(problem.question()), 'Q(y_2, A)')
+
+    def test_cnf_variables_renamed_apart(self):
+        problem = parse_tptp("""
+            cnf(c1, axiom, p(X, a)).
+            cnf(c2, axiom, ~ p(b, X)).
+        """)
+        c1, c2 = problem.clauses
+        self.assertTrue(variables(c1).isdisjoint(variables(c2)))
+        prov = ResolutionProver()
+        for c in problem.clauses:
+            prov.add_clause(c)
+        ok, _ = prov.prove_by_refutation(None)
+        self.assertTrue(ok)
+
+    def test_rejects_trailing_tokens(self):
+        for text in ("fof(a, axiom, p & q => r).", "cnf(a, axiom, p(X) garbage here)."):
+            with self.assertRaises(ValueError):
+                parse_tptp(text)
+
+    def test_rejects_equality_and_include(self):
+        for text in ("cnf(a, axiom, X = a).", "include('Axioms/SET001.ax')."):
+            with self.assertRaises(ValueError):
+                parse_tptp(text)
+
+
+class RoundTripTest(unittest.TestCase):
+    def clauses(self, *lines):
+        prov = ResolutionProver()
+        return [prov.parse_clause_from_string(ln) for ln in lines]
+
+    def test_tptp(self):
+        clauses = self.clauses('P(x) ∨ ¬Q(F(G(x)), A)', 'Q(B, Cte)')
+        negated = self.clauses('¬P(A)')
+        problem = parse_tptp(clauses_to_tptp(clauses, negated))
+        # Las variables vuelven renombradas por entrada: x -> x_1
+        self.assertEqual([str(c) for c in problem.clauses], ['P(x_1) ∨ ¬Q(F(G(x_1)), A)', 'Q(B, Cte)'])
+        self.assertEqual([str(c) for c in problem.negated_conjectures], ['¬P(A)'])
+
+    def test_dimacs(self):
+        clauses = self.clauses('P(A) ∨ ¬Q(F(G(B)))', 'Q(F(G(B)))', '¬P(A)')
+        text, atoms = clauses_to_dimacs(clauses)
+        self.assertIn("p cnf 2 3", text)
+        self.assertEqual([str(a) for a in atoms], ['P(A)', 'Q(F(G(B)))'])
+        self.assertEqual([c.signature() for c in parse_dimacs(text)], [c.signature() for c in clauses])
+
+    def test_dimacs_rejects_variables(self):
+        with self.assertRaises(ValueError):
+            clauses_to_dimacs(self.clauses('P(x)'))
+
+
+if __name__ == "__main__":
+    unittest.main()